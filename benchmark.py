@@ -0,0 +1,222 @@
+import os
+import json
+import math
+import time
+import random
+import signal
+import argparse
+import platform
+import subprocess
+
+# Must be set before pygame creates the window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import main
+from main import Game, Monster, SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE
+from flow_field import FlowField
+from event_log import EventLog
+
+
+class BenchmarkSettings:
+    COUNTS = [10, 100, 1000, 10000, 100000]
+    REPEATS = 5
+    # Larger counts of a case are skipped when a call is projected to take longer than this
+    TIME_BUDGET = 10.0
+    OUTPUT = "bench_results.json"
+    SEED = 1234
+    # Monsters need unique cells and free ones to move into, the grid grows to keep this fill
+    MAX_MONSTER_FILL = 0.5
+
+
+class CaseTimeout(Exception):
+    pass
+
+
+def raise_timeout(signum, frame):
+    raise CaseTimeout()
+
+
+def get_grid_size(count):
+    # Never smaller than the real 7x7 grid
+    cells = count / BenchmarkSettings.MAX_MONSTER_FILL + 1
+    return max(SCREEN_WIDTH // TILE_SIZE, math.ceil(math.sqrt(cells)))
+
+
+def set_grid_size(game, size):
+    # The game reads the grid size from module globals, so they are patched per case
+    if (main.GRID_WIDTH, main.GRID_HEIGHT) != (size, size):
+        main.GRID_WIDTH = main.GRID_HEIGHT = size
+        game.flow_field = FlowField(size, size)
+    for player in game.players:
+        player.grid_x = min(player.grid_x, size - 1)
+        player.grid_y = min(player.grid_y, size - 1)
+
+
+def populate(game, count, rng):
+    size = get_grid_size(count)
+    set_grid_size(game, size)
+    player_cells = {(p.grid_x, p.grid_y) for p in game.players}
+    cells = [(x, y) for y in range(size) for x in range(size) if (x, y) not in player_cells]
+    game.monsters = []
+    for grid_x, grid_y in rng.sample(cells, count):
+        monster = Monster(grid_x, grid_y, rng.choice(game.monster_images))
+        monster.max_health = rng.randint(1, 6)
+        monster.health = monster.max_health
+        game.monsters.append(monster)
+
+    game.bullets = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        game.bullets.append({
+            'x': rng.uniform(0, SCREEN_WIDTH),
+            'y': rng.uniform(0, SCREEN_HEIGHT),
+            'dx': math.cos(angle) * 5,
+            'dy': math.sin(angle) * 5,
+            'range_left': game.max_shoot_range * TILE_SIZE,
+        })
+
+    game.hit_tiles = [
+        {'x': rng.randrange(size), 'y': rng.randrange(size), 'timer': 30}
+        for _ in range(count)
+    ]
+    game.level_completed = False
+
+
+def get_cases(game):
+    def replan_monsters():
+        # What a tick costs right after a player moved: the flow field is rebuilt and everyone steps
+        game.flow_field.targets = None
+        game.update_monsters(move_prob=1.0)
+
+    return {
+        'update_bullets': game.update_bullets,
+        'update_monsters': game.update_monsters,
+        'replan_monsters': replan_monsters,
+        'update_hit_tiles': game.update_hit_tiles,
+        'draw_monsters': game.draw_monsters,
+        'draw_hit_tiles': game.draw_hit_tiles,
+        'draw_bullets': game.draw_bullets,
+        'tick': lambda: game.step([]),
+    }
+
+
+def run_limited(case):
+    # Projections miss costs that only show up at larger counts, so a call is also cut off
+    if not hasattr(signal, 'setitimer'):
+        case()
+        return
+    signal.signal(signal.SIGALRM, raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, BenchmarkSettings.TIME_BUDGET)
+    try:
+        case()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def time_case(game, name, count, repeats, seed):
+    # Untimed warm-up so first-call costs do not land in the smallest counts
+    populate(game, count, random.Random(seed))
+    game.rng = random.Random(seed)
+    run_limited(get_cases(game)[name])
+
+    times = []
+    for repeat in range(repeats):
+        # Every repeat starts from the same state, setup is not timed
+        populate(game, count, random.Random(seed + repeat))
+        game.rng = random.Random(seed + repeat)
+        case = get_cases(game)[name]
+        start = time.perf_counter()
+        case()
+        times.append(time.perf_counter() - start)
+        if sum(times) > BenchmarkSettings.TIME_BUDGET:
+            break
+
+    times.sort()
+    return {
+        'name': name,
+        'count': count,
+        'grid_size': get_grid_size(count),
+        'repeats': len(times),
+        'min_ms': times[0] * 1000,
+        'median_ms': times[len(times) // 2] * 1000,
+        'mean_ms': sum(times) / len(times) * 1000,
+        'max_ms': times[-1] * 1000,
+    }
+
+
+def project_time(previous, result, next_count):
+    # Extrapolate with the growth rate measured between the last two counts
+    if previous is None or previous['min_ms'] <= 0:
+        return result['min_ms'] / 1000 * next_count / result['count']
+    exponent = math.log(result['min_ms'] / previous['min_ms']) / math.log(result['count'] / previous['count'])
+    exponent = max(1.0, exponent)
+    return result['min_ms'] / 1000 * (next_count / result['count']) ** exponent
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(counts, repeats, names=None):
+    game = Game(seed=BenchmarkSettings.SEED, event_log=EventLog(os.devnull))
+    names = names or list(get_cases(game))
+
+    results = []
+    for name in names:
+        previous = None
+        result = None
+        timed_out = False
+        for count in counts:
+            if timed_out:
+                results.append({'name': name, 'count': count, 'skipped': True})
+                print(f"{name:>18} {count:>7}  skipped (smaller count timed out)")
+                continue
+            if result is not None:
+                projected = project_time(previous, result, count)
+                if projected > BenchmarkSettings.TIME_BUDGET:
+                    results.append({'name': name, 'count': count, 'skipped': True, 'projected_ms': projected * 1000})
+                    print(f"{name:>18} {count:>7}  skipped (projected {projected:.1f} s)")
+                    continue
+                previous = result
+            try:
+                result = time_case(game, name, count, repeats, BenchmarkSettings.SEED)
+            except CaseTimeout:
+                timed_out = True
+                results.append({'name': name, 'count': count, 'skipped': True, 'timed_out': True})
+                print(f"{name:>18} {count:>7}  timed out (over {BenchmarkSettings.TIME_BUDGET:g} s)")
+                continue
+            results.append(result)
+            print(f"{name:>18} {count:>7}  {result['median_ms']:10.3f} ms  ({result['grid_size']}x{result['grid_size']} grid)")
+
+    game.event_log.close()
+    return {
+        'commit': get_commit(),
+        'time': time.time(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'video_driver': os.environ.get("SDL_VIDEODRIVER"),
+        'counts': counts,
+        'repeats': repeats,
+        'results': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs='+', default=BenchmarkSettings.COUNTS)
+    parser.add_argument("--repeats", type=int, default=BenchmarkSettings.REPEATS)
+    parser.add_argument("--only", nargs='+', help="case names to run, e.g. update_bullets tick")
+    parser.add_argument("--output", default=BenchmarkSettings.OUTPUT)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.counts, args.repeats, args.only)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    pygame.quit()
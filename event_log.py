@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class EventLogSettings:
+    PATH = "events.jsonl"
+    BUFFER_SIZE = 8192
+    FLUSH_INTERVAL = 0.5
+
+
+class EventLog:
+    def __init__(self, path=EventLogSettings.PATH, buffer_size=EventLogSettings.BUFFER_SIZE,
+                 flush_interval=EventLogSettings.FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        # Oldest events are dropped when the writer falls behind, the game never waits
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.dropped_written = 0
+        # log() is also called from the camera thread, the lock keeps counts in the right tick
+        self.lock = threading.Lock()
+
+        self.tick = 0
+        self.tick_counts = {}
+        self.last_tick_counts = {}
+        self.total_counts = {}
+
+        self.session = None
+
+        self.running = False
+        self.wake = threading.Event()
+        self.writer_thread = None
+
+    def start(self, **session):
+        if self.running:
+            return
+        # Every game appends to the same file, the header marks where a session begins
+        self.session = {'time': time.time(), 'tick': 0, 'event': 'session_start'}
+        self.session.update(session)
+        self.running = True
+        self.writer_thread = threading.Thread(target=self.writer_loop)
+        self.writer_thread.daemon = True
+        self.writer_thread.start()
+
+    def log(self, event_type, **fields):
+        with self.lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append((time.time(), self.tick, event_type, fields))
+            self.tick_counts[event_type] = self.tick_counts.get(event_type, 0) + 1
+
+    def end_tick(self):
+        with self.lock:
+            counts = self.tick_counts
+            self.tick_counts = {}
+            self.tick += 1
+        for event_type, count in counts.items():
+            self.total_counts[event_type] = self.total_counts.get(event_type, 0) + count
+        self.last_tick_counts = counts
+
+    def writer_loop(self):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(self.session) + '\n')
+            while self.running:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                self.write_pending(f)
+            self.write_pending(f)
+
+    def write_pending(self, f):
+        lines = []
+        while self.buffer:
+            timestamp, tick, event_type, fields = self.buffer.popleft()
+            entry = {'time': timestamp, 'tick': tick, 'event': event_type}
+            entry.update(fields)
+            lines.append(json.dumps(entry))
+
+        dropped = self.dropped
+        if dropped != self.dropped_written:
+            lines.append(json.dumps({'time': time.time(), 'tick': self.tick, 'event': 'log_dropped',
+                                     'count': dropped - self.dropped_written, 'total': dropped}))
+            self.dropped_written = dropped
+        if lines:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+
+    def close(self):
+        if not self.running:
+            return
+        self.running = False
+        self.wake.set()
+        self.writer_thread.join()
+        self.writer_thread = None
@@ -0,0 +1,57 @@
+from collections import deque
+
+UNREACHABLE = -1
+
+
+class FlowField:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.distances = [UNREACHABLE] * (width * height)
+        self.targets = None
+
+    def update(self, targets):
+        # Only rebuilt when a player moved
+        targets = tuple(targets)
+        if targets != self.targets:
+            self.targets = targets
+            self.compute()
+
+    def compute(self):
+        width, height = self.width, self.height
+        distances = [UNREACHABLE] * (width * height)
+        self.distances = distances
+
+        # Every player is a source, monsters head for the nearest one
+        queue = deque()
+        for tx, ty in self.targets:
+            if distances[ty * width + tx] == UNREACHABLE:
+                distances[ty * width + tx] = 0
+                queue.append((tx, ty))
+
+        while queue:
+            x, y = queue.popleft()
+            next_distance = distances[y * width + x] + 1
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                index = ny * width + nx
+                if distances[index] != UNREACHABLE:
+                    continue
+                distances[index] = next_distance
+                queue.append((nx, ny))
+
+    def get_steps(self, x, y):
+        # Neighbouring cells one step closer to the nearest target
+        current = self.distances[y * self.width + x]
+        if current == UNREACHABLE:
+            return []
+
+        steps = []
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                continue
+            distance = self.distances[ny * self.width + nx]
+            if distance != UNREACHABLE and distance < current:
+                steps.append((nx, ny))
+        return steps
@@ -0,0 +1,325 @@
+import socket
+import struct
+import threading
+import time
+import argparse
+from collections import deque
+from hand_controller import HandGestureController, HandGestureSettings, CameraManager
+
+
+class GestureServiceSettings:
+    PORT = 47800
+    PROTOCOL_VERSION = 2
+    PING_INTERVAL = 1.0
+    SUBSCRIBER_TIMEOUT = 5.0
+    LATENCY_HISTORY_SIZE = 200
+    RECEIVE_TIMEOUT = 0.2
+
+
+MSG_PING = 1
+MSG_PONG = 2
+MSG_SHOOT = 3
+MSG_DIRECTION = 4
+
+# Every packet starts with (version, message type)
+HEADER = struct.Struct('!BB')
+PING = struct.Struct('!BBd')            # client send time
+PONG = struct.Struct('!BBdd')           # echoed client send time, server time
+SHOOT = struct.Struct('!BBIdBf')        # sequence, server timestamp, hand, angle in degrees
+DIRECTION = struct.Struct('!BBIdBbb')   # sequence, server timestamp, hand, dx, dy
+
+
+class GestureServer:
+    def __init__(self, host='0.0.0.0', port=GestureServiceSettings.PORT, controller=None, camera_manager=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(GestureServiceSettings.RECEIVE_TIMEOUT)
+        self.address = self.sock.getsockname()
+
+        # Without a camera the server is a stand-in that only sends what it is told to
+        self.controller = controller
+        self.camera_manager = camera_manager
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        targets = [self.receive_loop]
+        if self.camera_manager is not None:
+            if not self.camera_manager.start_camera():
+                print("Cannot start camera!")
+                self.running = False
+                return False
+            targets.append(self.camera_loop)
+
+        for target in targets:
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        print(f"Gesture server listening on {self.address[0]}:{self.address[1]}")
+        return True
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.camera_manager is not None:
+            self.camera_manager.stop_camera()
+        if self.controller is not None:
+            self.controller.close()
+        self.sock.close()
+
+    def receive_loop(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            if len(data) != PING.size:
+                continue
+            version, msg_type, client_time = PING.unpack(data)
+            if version != GestureServiceSettings.PROTOCOL_VERSION or msg_type != MSG_PING:
+                continue
+
+            with self.lock:
+                self.subscribers[addr] = time.time()
+            self.send_to(addr, PONG.pack(version, MSG_PONG, client_time, time.time()))
+
+    def camera_loop(self):
+        last_directions = [(0, 0)] * self.controller.max_num_hands
+        while self.running:
+            frame = self.camera_manager.get_frame()
+            if frame is None:
+                continue
+
+            processed_frame, results, shots = self.controller.process_frame(frame)
+            for hand, shoot_angle in shots:
+                self.send_shoot(shoot_angle, hand)
+
+            for hand in range(self.controller.max_num_hands):
+                direction = self.controller.get_direction(hand)
+                if direction != last_directions[hand]:
+                    self.send_direction(*direction, hand)
+                    last_directions[hand] = direction
+
+    def next_seq(self):
+        with self.lock:
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+            return self.seq
+
+    def send_shoot(self, angle, hand=0):
+        packet = SHOOT.pack(GestureServiceSettings.PROTOCOL_VERSION, MSG_SHOOT,
+                            self.next_seq(), time.time(), hand, angle)
+        self.broadcast(packet)
+
+    def send_direction(self, dx, dy, hand=0):
+        packet = DIRECTION.pack(GestureServiceSettings.PROTOCOL_VERSION, MSG_DIRECTION,
+                                self.next_seq(), time.time(), hand, dx, dy)
+        self.broadcast(packet)
+
+    def broadcast(self, packet):
+        now = time.time()
+        with self.lock:
+            for addr, last_seen in list(self.subscribers.items()):
+                if now - last_seen > GestureServiceSettings.SUBSCRIBER_TIMEOUT:
+                    del self.subscribers[addr]
+            subscribers = list(self.subscribers)
+        for addr in subscribers:
+            self.send_to(addr, packet)
+
+    def send_to(self, addr, packet):
+        try:
+            self.sock.sendto(packet, addr)
+        except OSError as e:
+            print(f"Error sending gesture event to {addr}: {e}")
+
+
+class GestureClient:
+    def __init__(self, host, port=GestureServiceSettings.PORT, on_shoot=None, on_direction=None):
+        # Resolved once so replies can be matched against the exact sender address
+        self.server_address = (socket.gethostbyname(host), port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('', 0))
+        self.sock.settimeout(GestureServiceSettings.RECEIVE_TIMEOUT)
+
+        self.on_shoot = on_shoot
+        self.on_direction = on_direction
+        self.directions = {}
+
+        # Clock offset is taken from the ping with the smallest round trip
+        self.clock_offset = 0.0
+        self.best_rtt = None
+        self.last_rtt = None
+        self.latencies = deque(maxlen=GestureServiceSettings.LATENCY_HISTORY_SIZE)
+        self.events_received = 0
+        self.events_lost = 0
+        self.last_seq = None
+
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        self.ping()
+        for target in (self.receive_loop, self.ping_loop):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return True
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        self.sock.close()
+
+    def ping(self):
+        packet = PING.pack(GestureServiceSettings.PROTOCOL_VERSION, MSG_PING, time.time())
+        try:
+            self.sock.sendto(packet, self.server_address)
+        except OSError as e:
+            print(f"Error pinging gesture server: {e}")
+
+    def ping_loop(self):
+        next_ping = time.time() + GestureServiceSettings.PING_INTERVAL
+        while self.running:
+            time.sleep(GestureServiceSettings.RECEIVE_TIMEOUT)
+            if time.time() >= next_ping:
+                self.ping()
+                next_ping = time.time() + GestureServiceSettings.PING_INTERVAL
+
+    def receive_loop(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            # Anything not from our server could inject shots or skew the clock offset
+            if addr != self.server_address:
+                continue
+            self.handle_packet(data, time.time())
+
+    def handle_packet(self, data, received_at):
+        if len(data) < HEADER.size:
+            return
+        version, msg_type = HEADER.unpack_from(data)
+        if version != GestureServiceSettings.PROTOCOL_VERSION:
+            return
+
+        if msg_type == MSG_PONG and len(data) == PONG.size:
+            _, _, sent_at, server_time = PONG.unpack(data)
+            rtt = received_at - sent_at
+            self.last_rtt = rtt
+            if self.best_rtt is None or rtt <= self.best_rtt:
+                self.best_rtt = rtt
+                self.clock_offset = server_time - (sent_at + received_at) / 2
+
+        elif msg_type == MSG_SHOOT and len(data) == SHOOT.size:
+            _, _, seq, timestamp, hand, angle = SHOOT.unpack(data)
+            if hand >= HandGestureSettings.MAX_NUM_HANDS:
+                return
+            self.track_event(seq, timestamp, received_at)
+            if self.on_shoot:
+                self.on_shoot(angle, hand)
+
+        elif msg_type == MSG_DIRECTION and len(data) == DIRECTION.size:
+            _, _, seq, timestamp, hand, dx, dy = DIRECTION.unpack(data)
+            if hand >= HandGestureSettings.MAX_NUM_HANDS:
+                return
+            self.track_event(seq, timestamp, received_at)
+            self.directions[hand] = (dx, dy)
+            if self.on_direction:
+                self.on_direction(dx, dy, hand)
+
+    def track_event(self, seq, timestamp, received_at):
+        if self.last_seq is None or seq > self.last_seq:
+            if self.last_seq is not None:
+                self.events_lost += seq - self.last_seq - 1
+            self.last_seq = seq
+        elif self.events_lost > 0:
+            # Arrived out of order, it was counted as lost when a later one came in
+            self.events_lost -= 1
+        self.events_received += 1
+        self.latencies.append(received_at - (timestamp - self.clock_offset))
+
+    def get_stats(self):
+        latencies = sorted(self.latencies)
+        stats = {
+            'clock_offset_ms': self.clock_offset * 1000,
+            'rtt_ms': self.last_rtt * 1000 if self.last_rtt is not None else None,
+            'events_received': self.events_received,
+            'events_lost': self.events_lost,
+        }
+        if latencies:
+            stats['latency_mean_ms'] = sum(latencies) / len(latencies) * 1000
+            stats['latency_p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            stats['latency_max_ms'] = latencies[-1] * 1000
+        return stats
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(':')
+    if not host:
+        return value, GestureServiceSettings.PORT
+    return host, int(port)
+
+
+def run_loopback(count=100, interval=0.01):
+    server = GestureServer('127.0.0.1', 0)
+    server.start()
+    shots = []
+    client = GestureClient(*server.address, on_shoot=lambda angle, hand: shots.append((hand, angle)))
+    client.start()
+
+    # Wait for the client to register before sending
+    deadline = time.time() + 2
+    while not server.subscribers and time.time() < deadline:
+        time.sleep(0.01)
+
+    for i in range(count):
+        server.send_shoot(float(i % 360), i % 2)
+        time.sleep(interval)
+    server.send_direction(1, 0, 0)
+    server.send_direction(0, -1, 1)
+    time.sleep(0.1)
+
+    stats = client.get_stats()
+    client.stop()
+    server.stop()
+    print(f"Received {len(shots)}/{count} shots, directions {client.directions}")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["serve", "loopback"])
+    parser.add_argument("--address", default=f"0.0.0.0:{GestureServiceSettings.PORT}")
+    args = parser.parse_args()
+
+    if args.mode == "loopback":
+        run_loopback()
+    else:
+        server = GestureServer(*parse_address(args.address),
+                               controller=HandGestureController(),
+                               camera_manager=CameraManager())
+        if server.start():
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+            server.stop()
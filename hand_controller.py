@@ -11,6 +11,11 @@ class HandGestureSettings:
     CENTER_ZONE = 50
     MIN_DETECTION_CONFIDENCE = 0.7
     MIN_TRACKING_CONFIDENCE = 0.5
+    MAX_NUM_HANDS = 2
+    # Normalised wrist distance for matching a hand to the one seen last frame
+    HAND_MATCH_DISTANCE = 0.25
+    HANDEDNESS_PENALTY = 0.1
+    HAND_LOST_TIME = 0.5
     
 
     SHOOT_GESTURE_THRESHOLD = 30  
@@ -23,108 +28,169 @@ class CameraSettings:
 
 
 class HandGestureController:
-    def __init__(self):
-        self.last_positions = []
+    def __init__(self, event_log=None):
+        self.event_log = event_log
+        self.max_num_hands = HandGestureSettings.MAX_NUM_HANDS
         self.position_history_size = HandGestureSettings.POSITION_HISTORY_SIZE
         self.movement_threshold = HandGestureSettings.MOVEMENT_THRESHOLD
-        self.last_direction = (0, 0)
         self.direction_hold_time = HandGestureSettings.DIRECTION_HOLD_TIME
-        self.last_direction_time = 0
         self.center_zone = HandGestureSettings.CENTER_ZONE
-        
-        self.is_ready_to_shoot = False
-        self.shoot_angle = 0
-        self.finger_angle = 0
-        self.last_shoot_time = 0
         self.shoot_cooldown = HandGestureSettings.SHOOT_COOLDOWN
-        
+
+        # Per-hand state, indexed by a hand ID that stays stable across frames
+        n = self.max_num_hands
+        self.hand_active = np.zeros(n, dtype=bool)
+        self.hand_labels = np.full(n, -1, dtype=np.int8)
+        self.hand_centers = np.zeros((n, 2))
+        self.hand_last_seen = np.zeros(n)
+        self.hand_positions = np.zeros((n, self.position_history_size, 2))
+        self.hand_position_counts = np.zeros(n, dtype=np.int32)
+        self.hand_position_next = np.zeros(n, dtype=np.int32)
+        self.hand_directions = np.zeros((n, 2), dtype=np.int8)
+        self.last_directions = np.zeros((n, 2), dtype=np.int8)
+        self.last_direction_times = np.zeros(n)
+        self.is_ready_to_shoot = np.zeros(n, dtype=bool)
+        self.shoot_angles = np.zeros(n)
+        self.finger_angles = np.zeros(n)
+        self.last_shoot_times = np.zeros(n)
+
         # MediaPipe setup
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=1,
+            max_num_hands=self.max_num_hands,
             min_detection_confidence=HandGestureSettings.MIN_DETECTION_CONFIDENCE,
             min_tracking_confidence=HandGestureSettings.MIN_TRACKING_CONFIDENCE
         )
-        
-    def add_position(self, x, y):
-        self.last_positions.append((x, y))
-        if len(self.last_positions) > self.position_history_size:
-            self.last_positions.pop(0)
-    
-    def get_smoothed_position(self):
-        if not self.last_positions:
-            return None
-        
-        avg_x = sum(pos[0] for pos in self.last_positions) / len(self.last_positions)
-        avg_y = sum(pos[1] for pos in self.last_positions) / len(self.last_positions)
-        return avg_x, avg_y
-    
-    def calculate_angle_between_points(self, point1, point2, point3):
-        v1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-        v2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-        
-        dot_product = np.dot(v1, v2)
-        norms = np.linalg.norm(v1) * np.linalg.norm(v2)
-        
-        if norms == 0:
-            return 0
-            
-        cos_angle = dot_product / norms
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)
-        angle = np.arccos(cos_angle)
-        return math.degrees(angle)
-    
-    def get_direction_angle(self, point1, point2):
-        dx = point2[0] - point1[0]
-        dy = point2[1] - point1[1]
-        
-        angle_rad = math.atan2(-dy, dx)  
-        angle_deg = math.degrees(angle_rad)
-        
-        if angle_deg < 0:
-            angle_deg += 360
-            
-        return angle_deg
-    
-    def is_shoot_gesture(self, hand_landmarks, frame_width, frame_height):
-        wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-        thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        thumb_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_MCP]
-        index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        index_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_MCP]
-        index_pip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_PIP]
-        middle_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-        middle_pip = hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP]
-        
-        wrist_px = [int(wrist.x * frame_width), int(wrist.y * frame_height)]
-        thumb_tip_px = [int(thumb_tip.x * frame_width), int(thumb_tip.y * frame_height)]
-        thumb_mcp_px = [int(thumb_mcp.x * frame_width), int(thumb_mcp.y * frame_height)]
-        index_tip_px = [int(index_tip.x * frame_width), int(index_tip.y * frame_height)]
-        index_mcp_px = [int(index_mcp.x * frame_width), int(index_mcp.y * frame_height)]
-        index_pip_px = [int(index_pip.x * frame_width), int(index_pip.y * frame_height)]
-        
-        index_straight = index_tip.y < index_pip.y
-        
-        middle_bent = middle_tip.y > middle_pip.y
-        
-        self.finger_angle = self.calculate_angle_between_points(
-            thumb_tip_px, wrist_px, index_tip_px
-        )
-        
-        self.shoot_angle = self.get_direction_angle(index_mcp_px, index_tip_px)
-        
-        distance = math.sqrt((thumb_tip_px[0] - index_tip_px[0])**2 + 
-                           (thumb_tip_px[1] - index_tip_px[1])**2)
-        
-        angle_ok = 60 < self.finger_angle < 120  
+        landmark = self.mp_hands.HandLandmark
+        self.landmark_ids = {
+            'wrist': int(landmark.WRIST),
+            'thumb_tip': int(landmark.THUMB_TIP),
+            'index_tip': int(landmark.INDEX_FINGER_TIP),
+            'index_mcp': int(landmark.INDEX_FINGER_MCP),
+            'index_pip': int(landmark.INDEX_FINGER_PIP),
+            'middle_tip': int(landmark.MIDDLE_FINGER_TIP),
+            'middle_pip': int(landmark.MIDDLE_FINGER_PIP),
+        }
+
+    def get_landmark_array(self, results):
+        # (hands, 21, 2) normalised x, y for every detected hand
+        return np.array([[(lm.x, lm.y) for lm in hand_landmarks.landmark]
+                         for hand_landmarks in results.multi_hand_landmarks])
+
+    def get_handedness(self, results, count):
+        labels = np.full(count, -1, dtype=np.int8)
+        if results.multi_handedness:
+            for i, handedness in enumerate(results.multi_handedness[:count]):
+                labels[i] = 1 if handedness.classification[0].label == 'Right' else 0
+        return labels
+
+    def assign_hand_ids(self, landmarks, labels, now):
+        self.hand_active &= (now - self.hand_last_seen) < HandGestureSettings.HAND_LOST_TIME
+        centers = landmarks[:, self.landmark_ids['wrist']]
+
+        # Match detections to known hands by wrist distance, penalising a handedness flip
+        cost = np.linalg.norm(centers[:, None, :] - self.hand_centers[None, :, :], axis=2)
+        cost = cost + HandGestureSettings.HANDEDNESS_PENALTY * (labels[:, None] != self.hand_labels[None, :])
+        cost[:, ~self.hand_active] = np.inf
+
+        hand_ids = np.full(len(centers), -1)
+        for flat_index in np.argsort(cost, axis=None):
+            detection, hand_id = np.unravel_index(flat_index, cost.shape)
+            if cost[detection, hand_id] > HandGestureSettings.HAND_MATCH_DISTANCE:
+                break
+            if hand_ids[detection] == -1 and hand_id not in hand_ids:
+                hand_ids[detection] = hand_id
+
+        for detection in np.flatnonzero(hand_ids == -1):
+            free = np.flatnonzero(~self.hand_active & ~np.isin(np.arange(self.max_num_hands), hand_ids))
+            if len(free) == 0:
+                continue
+            # A returning hand gets back the slot (and player) it had with the same handedness
+            same_label = free[self.hand_labels[free] == labels[detection]]
+            hand_id = same_label[0] if len(same_label) else free[0]
+            hand_ids[detection] = hand_id
+            self.reset_hand(hand_id)
+            self.log_event('hand_found', hand=int(hand_id))
+
+        tracked = hand_ids >= 0
+        ids = hand_ids[tracked]
+        self.hand_active[ids] = True
+        self.hand_labels[ids] = labels[tracked]
+        self.hand_centers[ids] = centers[tracked]
+        self.hand_last_seen[ids] = now
+        return hand_ids
+
+    def reset_hand(self, hand_id):
+        self.hand_positions[hand_id] = 0
+        self.hand_position_counts[hand_id] = 0
+        self.hand_position_next[hand_id] = 0
+        self.hand_directions[hand_id] = 0
+        self.last_directions[hand_id] = 0
+        self.last_direction_times[hand_id] = 0
+        self.is_ready_to_shoot[hand_id] = False
+
+    def classify_hands(self, landmarks, frame_width, frame_height):
+        ids = self.landmark_ids
+        pixels = (landmarks * (frame_width, frame_height)).astype(np.int32)
+        wrist = pixels[:, ids['wrist']]
+        thumb_tip = pixels[:, ids['thumb_tip']]
+        index_tip = pixels[:, ids['index_tip']]
+        index_mcp = pixels[:, ids['index_mcp']]
+
+        index_straight = landmarks[:, ids['index_tip'], 1] < landmarks[:, ids['index_pip'], 1]
+        middle_bent = landmarks[:, ids['middle_tip'], 1] > landmarks[:, ids['middle_pip'], 1]
+
+        v1 = thumb_tip - wrist
+        v2 = index_tip - wrist
+        norms = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+        cos_angle = np.divide((v1 * v2).sum(axis=1), norms, out=np.ones(len(norms)), where=norms > 0)
+        finger_angles = np.where(norms > 0, np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0))), 0)
+
+        pointing = index_tip - index_mcp
+        shoot_angles = np.degrees(np.arctan2(-pointing[:, 1], pointing[:, 0])) % 360
+
+        distance = np.linalg.norm(thumb_tip - index_tip, axis=1)
+
+        angle_ok = (finger_angles > 60) & (finger_angles < 120)
         distance_ok = distance > 60
-        
-        return (index_straight and middle_bent and angle_ok and distance_ok)
-    
-    def draw_angle_info(self, frame, thumb_pos, index_pos, wrist_pos):
+
+        gestures = index_straight & middle_bent & angle_ok & distance_ok
+        return gestures, finger_angles, shoot_angles, pixels
+
+    def update_directions(self, hand_ids, index_tips, frame_width, frame_height, now):
+        slots = self.hand_position_next[hand_ids]
+        self.hand_positions[hand_ids, slots] = index_tips
+        self.hand_position_next[hand_ids] = (slots + 1) % self.position_history_size
+        self.hand_position_counts[hand_ids] = np.minimum(self.hand_position_counts[hand_ids] + 1,
+                                                         self.position_history_size)
+
+        smoothed = self.hand_positions[hand_ids].sum(axis=1) / self.hand_position_counts[hand_ids][:, None]
+        dx = smoothed[:, 0] - frame_width // 2
+        dy = smoothed[:, 1] - frame_height // 2
+        in_center = (np.abs(dx) < self.center_zone) & (np.abs(dy) < self.center_zone)
+
+        horizontal = np.abs(dx) > np.abs(dy)
+        new_directions = np.zeros((len(hand_ids), 2), dtype=np.int8)
+        new_directions[:, 0] = np.where(horizontal & (np.abs(dx) > self.movement_threshold), np.sign(dx), 0)
+        new_directions[:, 1] = np.where(~horizontal & (np.abs(dy) > self.movement_threshold), np.sign(dy), 0)
+
+        last = self.last_directions[hand_ids]
+        held = (~in_center & (new_directions != last).any(axis=1) &
+                (now - self.last_direction_times[hand_ids] < self.direction_hold_time))
+        changed = ~in_center & ~held & new_directions.any(axis=1)
+        self.last_directions[hand_ids[changed]] = new_directions[changed]
+        self.last_direction_times[hand_ids[changed]] = now
+
+        directions = np.where(held[:, None], last, new_directions)
+        directions[in_center] = 0
+        self.hand_directions[:] = 0
+        self.hand_directions[hand_ids] = directions
+
+    def draw_angle_info(self, frame, hand_id, thumb_pos, index_pos, wrist_pos):
         h, w = frame.shape[:2]
+        shoot_angle = self.shoot_angles[hand_id]
         
         cv2.line(frame, tuple(wrist_pos), tuple(thumb_pos), (255, 0, 255), 2)
         cv2.line(frame, tuple(wrist_pos), tuple(index_pos), (255, 0, 255), 2)
@@ -135,73 +201,23 @@ class HandGestureController:
         cv2.circle(frame, tuple(index_pos), 10, (0, 0, 255), -1)
         
         shoot_length = 120
-        end_x = int(index_pos[0] + shoot_length * math.cos(math.radians(self.shoot_angle)))
-        end_y = int(index_pos[1] - shoot_length * math.sin(math.radians(self.shoot_angle)))
+        end_x = int(index_pos[0] + shoot_length * math.cos(math.radians(shoot_angle)))
+        end_y = int(index_pos[1] - shoot_length * math.sin(math.radians(shoot_angle)))
         cv2.arrowedLine(frame, tuple(index_pos), (end_x, end_y), (0, 255, 0), 4, tipLength=0.3)
         
-        info_y = 30
-        cv2.putText(frame, f"Finger Angle: {self.finger_angle:.1f}°", 
+        info_y = 30 + hand_id * 80
+        cv2.putText(frame, f"P{hand_id + 1} Finger Angle: {self.finger_angles[hand_id]:.1f}°", 
                    (10, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
-        cv2.putText(frame, f"Shoot Direction: {self.shoot_angle:.1f}°", 
+        cv2.putText(frame, f"P{hand_id + 1} Shoot Direction: {shoot_angle:.1f}°", 
                    (10, info_y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
         
-        status = "READY TO SHOOT!" if self.is_ready_to_shoot else "AIM..."
-        color = (0, 255, 0) if self.is_ready_to_shoot else (0, 255, 255)
+        status = "READY TO SHOOT!" if self.is_ready_to_shoot[hand_id] else "AIM..."
+        color = (0, 255, 0) if self.is_ready_to_shoot[hand_id] else (0, 255, 255)
         cv2.putText(frame, status, (10, info_y + 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        
-        cv2.putText(frame, "Make L-shape: Index straight, thumb up, others bent", 
-                   (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-        cv2.putText(frame, "Release gesture to shoot", 
-                   (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
     
-    def get_direction(self, results, frame_width, frame_height):
-        if not results.multi_hand_landmarks:
-            return 0, 0
-        
-        current_time = time.time()
-        
-        for hand_landmarks in results.multi_hand_landmarks:
-            index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            x = int(index_tip.x * frame_width)
-            y = int(index_tip.y * frame_height)
-            
-            self.add_position(x, y)
-            
-            smoothed_pos = self.get_smoothed_position()
-            if not smoothed_pos:
-                return 0, 0
-            
-            smooth_x, smooth_y = smoothed_pos
-            
-            center_x, center_y = frame_width // 2, frame_height // 2
-            
-            dx = smooth_x - center_x
-            dy = smooth_y - center_y
-            
-            if abs(dx) < self.center_zone and abs(dy) < self.center_zone:
-                return 0, 0
-            
-            new_direction = (0, 0)
-            
-            if abs(dx) > abs(dy): 
-                if abs(dx) > self.movement_threshold:
-                    new_direction = (1 if dx > 0 else -1, 0)
-            else:
-                if abs(dy) > self.movement_threshold:
-                    new_direction = (0, 1 if dy > 0 else -1)
-            
-            if (new_direction != self.last_direction and 
-                current_time - self.last_direction_time < self.direction_hold_time):
-                return self.last_direction
-            
-            if new_direction != (0, 0):
-                self.last_direction = new_direction
-                self.last_direction_time = current_time
-            
-            return new_direction
-        
-        return 0, 0
+    def get_direction(self, hand_id=0):
+        return tuple(int(v) for v in self.hand_directions[hand_id])
     
     def process_frame(self, frame):
         frame = cv2.flip(frame, 1)
@@ -209,58 +225,84 @@ class HandGestureController:
         
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.hands.process(rgb)
+        h, w, _ = frame.shape
         
-        shoot_command = False
-        shoot_angle = 0
+        # (hand_id, angle) for every hand that fired this frame
+        shots = []
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                h, w, _ = frame.shape
-                
+        if not results.multi_hand_landmarks:
+            self.hand_directions[:] = 0
+        else:
+            now = time.time()
+            landmarks = self.get_landmark_array(results)
+            labels = self.get_handedness(results, len(landmarks))
+            hand_ids = self.assign_hand_ids(landmarks, labels, now)
+            tracked = hand_ids >= 0
+            landmarks = landmarks[tracked]
+            hand_ids = hand_ids[tracked]
+
+            # One pass classifies every hand, only drawing below is per hand
+            gestures, finger_angles, shoot_angles, pixels = self.classify_hands(landmarks, w, h)
+            self.finger_angles[hand_ids] = finger_angles
+            self.shoot_angles[hand_ids] = shoot_angles
+            self.update_directions(hand_ids, pixels[:, self.landmark_ids['index_tip']], w, h, now)
+
+            was_ready = self.is_ready_to_shoot[hand_ids]
+            released = was_ready & ~gestures
+            cooled_down = now * 1000 - self.last_shoot_times[hand_ids] > self.shoot_cooldown
+            fired = released & cooled_down
+            self.last_shoot_times[hand_ids[fired]] = now * 1000
+            self.is_ready_to_shoot[hand_ids] = gestures
+
+            for hand_id in hand_ids[gestures & ~was_ready]:
+                self.log_event('gesture_ready', hand=int(hand_id), angle=float(self.shoot_angles[hand_id]))
+            for hand_id in hand_ids[fired]:
+                shots.append((int(hand_id), float(self.shoot_angles[hand_id])))
+                self.log_event('gesture_shoot', hand=int(hand_id), angle=float(self.shoot_angles[hand_id]))
+            for hand_id in hand_ids[released & ~cooled_down]:
+                self.log_event('gesture_cooldown', hand=int(hand_id))
+
+            tracked_landmarks = [hand_landmarks for hand_landmarks, is_tracked
+                                 in zip(results.multi_hand_landmarks, tracked) if is_tracked]
+            for hand_landmarks, hand_id, hand_pixels, gesture in zip(tracked_landmarks, hand_ids, pixels, gestures):
                 self.mp_drawing.draw_landmarks(
                     frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS,
                     self.mp_drawing.DrawingSpec(color=(100, 100, 100), thickness=1, circle_radius=1),
                     self.mp_drawing.DrawingSpec(color=(150, 150, 150), thickness=1)
                 )
                 
-                wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-                thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                index_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                
-                wrist_px = [int(wrist.x * w), int(wrist.y * h)]
-                thumb_px = [int(thumb_tip.x * w), int(thumb_tip.y * h)]
-                index_px = [int(index_tip.x * w), int(index_tip.y * h)]
+                wrist_px = hand_pixels[self.landmark_ids['wrist']].tolist()
+                thumb_px = hand_pixels[self.landmark_ids['thumb_tip']].tolist()
+                index_px = hand_pixels[self.landmark_ids['index_tip']].tolist()
+                cv2.putText(frame, f"P{hand_id + 1}", (wrist_px[0], wrist_px[1] + 25),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                 
-                if self.is_shoot_gesture(hand_landmarks, w, h):
-                    if not self.is_ready_to_shoot:
-                        self.is_ready_to_shoot = True
-                    
-                    self.draw_angle_info(frame, thumb_px, index_px, wrist_px)
-                    
+                if gesture:
+                    self.draw_angle_info(frame, hand_id, thumb_px, index_px, wrist_px)
                 else:
-                    if self.is_ready_to_shoot:
-                        current_time = time.time() * 1000
-                        if current_time - self.last_shoot_time > self.shoot_cooldown:
-                            shoot_command = True
-                            shoot_angle = self.shoot_angle
-                            self.last_shoot_time = current_time
-                            
-                            cv2.putText(frame, "SHOOT!", (w//2 - 50, h//2), 
-                                      cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 4)
-                    
-                    self.is_ready_to_shoot = False
-                    
                     cv2.circle(frame, tuple(index_px), 8, (255, 255, 0), -1)
                     cv2.circle(frame, tuple(thumb_px), 6, (255, 255, 0), -1)
-                
-                center_x, center_y = w // 2, h // 2
-                cv2.rectangle(frame, 
-                             (center_x - self.center_zone, center_y - self.center_zone), 
-                             (center_x + self.center_zone, center_y + self.center_zone), 
-                             (100, 100, 100), 1)
+
+            if shots:
+                cv2.putText(frame, "SHOOT!", (w//2 - 50, h//2), 
+                          cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 4)
+
+        center_x, center_y = w // 2, h // 2
+        cv2.rectangle(frame, 
+                     (center_x - self.center_zone, center_y - self.center_zone), 
+                     (center_x + self.center_zone, center_y + self.center_zone), 
+                     (100, 100, 100), 1)
+        cv2.putText(frame, "Make L-shape: Index straight, thumb up, others bent", 
+                   (10, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        cv2.putText(frame, "Release gesture to shoot", 
+                   (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
         
-        return frame, results, shoot_command, shoot_angle
+        return frame, results, shots
     
+    def log_event(self, event_type, **fields):
+        if self.event_log is not None:
+            self.event_log.log(event_type, **fields)
+
     def close(self):
         self.hands.close()
 
@@ -0,0 +1,134 @@
+import json
+import pygame
+
+# Posted by the hand control thread so gestures go through the event loop
+HAND_SHOOT = pygame.USEREVENT + 1
+HAND_MOVE = pygame.USEREVENT + 2
+# Posted whenever hand control actually turns on or off, replays apply it instead of the C key
+HAND_CONTROL = pygame.USEREVENT + 3
+
+
+def encode_event(event):
+    if event.type == pygame.QUIT:
+        return {'type': 'quit'}
+    elif event.type == pygame.KEYDOWN:
+        return {'type': 'key', 'key': event.key}
+    elif event.type == pygame.MOUSEBUTTONUP:
+        return {'type': 'mouse', 'button': event.button, 'pos': list(event.pos)}
+    elif event.type == HAND_SHOOT:
+        return {'type': 'hand_shoot', 'angle': event.angle, 'hand': event.hand}
+    elif event.type == HAND_MOVE:
+        return {'type': 'hand_move', 'dx': event.dx, 'dy': event.dy, 'hand': event.hand}
+    elif event.type == HAND_CONTROL:
+        return {'type': 'hand_control', 'enabled': event.enabled}
+    return None
+
+
+def decode_event(entry):
+    if entry['type'] == 'quit':
+        return pygame.event.Event(pygame.QUIT)
+    elif entry['type'] == 'key':
+        return pygame.event.Event(pygame.KEYDOWN, key=entry['key'])
+    elif entry['type'] == 'mouse':
+        return pygame.event.Event(pygame.MOUSEBUTTONUP, button=entry['button'], pos=tuple(entry['pos']))
+    elif entry['type'] == 'hand_shoot':
+        return pygame.event.Event(HAND_SHOOT, angle=entry['angle'], hand=entry.get('hand', 0))
+    elif entry['type'] == 'hand_move':
+        return pygame.event.Event(HAND_MOVE, dx=entry['dx'], dy=entry['dy'], hand=entry['hand'])
+    elif entry['type'] == 'hand_control':
+        return pygame.event.Event(HAND_CONTROL, enabled=entry['enabled'])
+    raise ValueError(f"Unknown event type in input log: {entry['type']}")
+
+
+class InputRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def start(self, seed):
+        self.file = open(self.path, 'w')
+        self.write({'seed': seed})
+
+    def record(self, tick, event):
+        entry = encode_event(event)
+        if entry is None:
+            return
+        entry['tick'] = tick
+        self.write(entry)
+
+    def write(self, entry):
+        if self.file:
+            self.file.write(json.dumps(entry) + '\n')
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class InputPlayer:
+    def __init__(self, path):
+        self.path = path
+        self.events = {}
+        self.last_tick = 0
+        self.frame_times = []
+
+        with open(path) as f:
+            header = json.loads(f.readline())
+            self.seed = header['seed']
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                tick = entry.pop('tick')
+                self.events.setdefault(tick, []).append(decode_event(entry))
+                self.last_tick = max(self.last_tick, tick)
+
+    def events_for_tick(self, tick):
+        return self.events.get(tick, [])
+
+    def finished(self, tick):
+        return tick > self.last_tick
+
+    def record_frame_time(self, seconds):
+        self.frame_times.append(seconds)
+
+    def get_profile(self):
+        times = sorted(self.frame_times)
+        if not times:
+            return {'log': self.path, 'seed': self.seed, 'ticks': 0}
+        return {
+            'log': self.path,
+            'seed': self.seed,
+            'ticks': len(times),
+            'total_ms': sum(times) * 1000,
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p50_ms': times[len(times) // 2] * 1000,
+            'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+            'max_ms': times[-1] * 1000,
+            'frame_times_ms': [t * 1000 for t in self.frame_times],
+        }
+
+    def save_profile(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.get_profile(), f, indent=2)
+
+
+if __name__ == "__main__":
+    # Headless replay: python input_recorder.py session.jsonl [profile.json]
+    import os
+    import sys
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from main import Game
+    from event_log import EventLog
+
+    player = InputPlayer(sys.argv[1])
+    # Replays must not add a second copy of the session to the live event log
+    game = Game(seed=player.seed, event_log=EventLog(os.devnull))
+    game.run(input_player=player)
+
+    profile = player.get_profile()
+    print(f"Replayed {profile['ticks']} ticks in {profile.get('total_ms', 0):.1f} ms")
+    if len(sys.argv) > 2:
+        player.save_profile(sys.argv[2])
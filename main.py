@@ -4,19 +4,29 @@ import os
 import random
 import glob
 import math
+import time
+import argparse
 import cv2
 import threading
 from hand_controller import *
+from input_recorder import HAND_SHOOT, HAND_MOVE, HAND_CONTROL, InputRecorder
+from flow_field import FlowField
+from gesture_service import GestureClient, parse_address
+from event_log import EventLog
+from sprite_cache import SpriteCache
 
 pygame.init()
 pygame.font.init()
 font = pygame.font.SysFont('Comic Sans MS', 30)
 
+# Game logic runs in these world units, the window is a scaled view of them
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 600
 TILE_SIZE = 80
 GRID_WIDTH = SCREEN_WIDTH // TILE_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // TILE_SIZE
+# Sprites are rescaled once the window has stopped changing size for this long
+RESIZE_SETTLE_MS = 150
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -33,44 +43,83 @@ class Monster:
         self.max_health = 1
 
 
+class Player:
+    def __init__(self, grid_x, grid_y, image):
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.image = image
+
+
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, seed=None, recorder=None, gesture_server=None, event_log=None):
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.recorder = recorder
+        if self.recorder:
+            self.recorder.start(seed)
+        self.tick_count = 0
+        self.replaying = False
+        self.event_log = event_log if event_log is not None else EventLog()
+        self.event_log.start(seed=seed)
+
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
         pygame.display.set_caption("Game")
         self.clock = pygame.time.Clock()
+        self.fullscreen = False
+        self.windowed_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.sprites = SpriteCache()
+        self.icon_sprites = SpriteCache(max_scales=1)
+        self.pending_resize = None
+        self.pending_resize_time = 0
         
-        self.player_grid_x = GRID_WIDTH - 1
-        self.player_grid_y = GRID_HEIGHT - 1
+        # Player 1 uses keyboard and mouse, each tracked hand drives its own player
+        self.players = [Player(GRID_WIDTH - 1, GRID_HEIGHT - 1, "player")]
         self.bullets = []
         self.max_shoot_range = 5
         self.hit_tiles = []
+        self.flow_field = FlowField(GRID_WIDTH, GRID_HEIGHT)
+        self.load_ui_icons()
         self.load_player_image()
         self.load_monsters()
+        self.resize(SCREEN_WIDTH, SCREEN_HEIGHT)
         self.spawn_monsters()
         self.show_help_window = False
         # Hand Controller
-        self.hand_controller = HandGestureController()
+        self.hand_controller = HandGestureController(event_log=self.event_log)
         self.camera_manager = CameraManager()
         self.camera_thread = None
         self.use_hand_control = False
+        # Game-side state, only changed by HAND_CONTROL events so replays see it on the same tick
+        self.hand_control_enabled = False
+        # Gestures come from a remote GestureServer when an address is given
+        self.gesture_server = gesture_server
+        self.gesture_client = None
+        self.last_hand_directions = {}
 
         self.level_completed = False
 
-    def update_monsters(self, move_prob=0.02):
+    def update_monsters(self, move_prob=0.02, chase=True):
         directions = [(1,0), (-1,0), (0,1), (0,-1)]
         
         occupied = {(m.grid_x, m.grid_y) for m in self.monsters}
-        player_pos = (self.player_grid_x, self.player_grid_y)
+        player_positions = [(p.grid_x, p.grid_y) for p in self.players]
+        if chase:
+            self.flow_field.update(player_positions)
         
         for monster in self.monsters:
-            if random.random() < move_prob:
-                random.shuffle(directions)  
-                for dx, dy in directions:
-                    nx = monster.grid_x + dx
-                    ny = monster.grid_y + dy
+            if self.rng.random() < move_prob:
+                steps = []
+                if chase:
+                    steps = self.flow_field.get_steps(monster.grid_x, monster.grid_y)
+                if not steps:
+                    self.rng.shuffle(directions)  
+                    steps = [(monster.grid_x + dx, monster.grid_y + dy) for dx, dy in directions]
+                for nx, ny in steps:
                     if not (0 <= nx < GRID_WIDTH and 0 <= ny < GRID_HEIGHT):
                         continue
-                    if (nx, ny) == player_pos:
+                    if (nx, ny) in player_positions:
                         continue
                     if (nx, ny) in occupied:
                         continue
@@ -81,14 +130,32 @@ class Game:
                     break 
    
     def toggle_hand_control(self):
+        if self.replaying:
+            # The recorded HAND_CONTROL event says what the key did, the camera stays off
+            return
         if self.use_hand_control:
             self.stop_hand_control()
         else:
             self.start_hand_control()
     
     def start_hand_control(self):
+        if self.gesture_server:
+            try:
+                self.gesture_client = GestureClient(*self.gesture_server, on_shoot=self.post_hand_shot,
+                                                    on_direction=self.post_hand_move)
+            except OSError as e:
+                # An unresolvable host must not take the game down with it
+                print(f"Cannot reach gesture server: {e}")
+                self.post_hand_control(False)
+                return False
+            self.gesture_client.start()
+            self.use_hand_control = True
+            self.post_hand_control(True)
+            print(f"Remote hand control activated ({self.gesture_server[0]}:{self.gesture_server[1]})")
+            return True
         if self.camera_manager.start_camera():
             self.use_hand_control = True
+            self.post_hand_control(True)
             self.camera_thread = threading.Thread(target=self.hand_control_loop)
             self.camera_thread.daemon = True
             self.camera_thread.start()
@@ -96,12 +163,35 @@ class Game:
             return True
         else:
             print("Cannot start camera!")
+            self.post_hand_control(False)
             return False
     
     def stop_hand_control(self):
         self.use_hand_control = False
-        self.camera_manager.stop_camera()
+        self.post_hand_control(False)
+        if self.gesture_client:
+            print(f"Gesture stats: {self.gesture_client.get_stats()}")
+            self.gesture_client.stop()
+            self.gesture_client = None
+        else:
+            self.camera_manager.stop_camera()
         print("Hand control deactivated!")
+
+    def post_hand_control(self, enabled):
+        # Also posted from the camera thread when ESC closes its window
+        pygame.event.post(pygame.event.Event(HAND_CONTROL, enabled=enabled))
+
+    def post_hand_shot(self, shoot_angle, hand=0):
+        if not self.is_valid_hand(hand):
+            return
+        # Handled on the game thread so it lands on a tick and can be recorded
+        game_angle = math.radians(shoot_angle)
+        pygame.event.post(pygame.event.Event(HAND_SHOOT, angle=-1*game_angle, hand=hand))
+
+    def post_hand_move(self, dx, dy, hand=0):
+        # Player 1 moves with the keyboard, only hand-only players move by pointing
+        if hand > 0 and self.is_valid_hand(hand) and (dx, dy) != (0, 0):
+            pygame.event.post(pygame.event.Event(HAND_MOVE, dx=dx, dy=dy, hand=hand))
     
     def hand_control_loop(self):
         while self.use_hand_control:
@@ -109,12 +199,17 @@ class Game:
             if frame is None:
                 continue
             
-            processed_frame, results, shoot_command, shoot_angle = self.hand_controller.process_frame(frame)
+            processed_frame, results, shots = self.hand_controller.process_frame(frame)
             
-            if shoot_command:
-                game_angle = math.radians(shoot_angle)
-                distance = 200  
-                self.shoot_bullet(-1*game_angle, distance)
+            for hand, shoot_angle in shots:
+                self.post_hand_shot(shoot_angle, hand)
+
+            # A second hand moves its player one tile each time its direction changes
+            for hand in range(1, self.hand_controller.max_num_hands):
+                direction = self.hand_controller.get_direction(hand)
+                if direction != self.last_hand_directions.get(hand, (0, 0)):
+                    self.post_hand_move(*direction, hand)
+                    self.last_hand_directions[hand] = direction
             
             cv2.imshow('Hand Control - Press ESC to close', processed_frame)
             
@@ -123,16 +218,74 @@ class Game:
                 break
     
 
+    def resize(self, width, height):
+        self.screen = pygame.display.get_surface()
+        # Whole tiles keep the grid lines on exact pixels
+        self.tile_size = max(1, min(width * TILE_SIZE // SCREEN_WIDTH, height * TILE_SIZE // SCREEN_HEIGHT))
+        self.view_scale = self.tile_size / TILE_SIZE
+        self.view_x = (width - int(SCREEN_WIDTH * self.view_scale)) // 2
+        self.view_y = (height - int(SCREEN_HEIGHT * self.view_scale)) // 2
+
+        self.hit_surface = pygame.Surface((self.tile_size, self.tile_size))
+        self.hit_surface.set_alpha(100)
+        self.hit_surface.fill(RED)
+        self.overlays = {}
+        # Build the new scale now so the next frames only blit
+        self.tile_sprites = self.sprites.get_scale((self.tile_size, self.tile_size))
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        if self.fullscreen:
+            self.windowed_size = self.screen.get_size()
+            pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+        self.pending_resize = None
+        self.resize(*pygame.display.get_surface().get_size())
+
+    def apply_pending_resize(self):
+        # Dragging the window edge sends a stream of resize events, rebuild after the last one
+        if self.pending_resize is None:
+            return
+        if pygame.time.get_ticks() - self.pending_resize_time < RESIZE_SETTLE_MS:
+            return
+        width, height = self.pending_resize
+        self.pending_resize = None
+        self.resize(width, height)
+
+    def to_screen(self, x, y):
+        return (self.view_x + int(x * self.view_scale), self.view_y + int(y * self.view_scale))
+
+    def to_world(self, pos):
+        return ((pos[0] - self.view_x) / self.view_scale, (pos[1] - self.view_y) / self.view_scale)
+
+    def get_overlay(self, alpha):
+        overlay = self.overlays.get(alpha)
+        if overlay is None:
+            overlay = pygame.Surface(self.screen.get_size())
+            overlay.set_alpha(alpha)
+            overlay.fill(BLACK)
+            self.overlays[alpha] = overlay
+        return overlay
+
+    def load_ui_icons(self):
+        for name in ['help', 'camera']:
+            try:
+                self.icon_sprites.load(f"icon:{name}", f"assets/icons/{name}.png")
+            except (pygame.error, FileNotFoundError) as e:
+                self.event_log.log('asset_error', file=f"{name}.png", error=str(e))
+                icon = pygame.Surface((30, 30))
+                icon.fill(GRAY)
+                self.icon_sprites.add(f"icon:{name}", icon)
+        self.icon_sprites.get_scale((30, 30))
+
     def draw_ui_icons(self):
-        help = pygame.image.load('assets/icons/help.png')
-        help = pygame.transform.scale(help, (30, 30))
-        self.screen.blit(help, (10, 10)) 
+        icons = self.icon_sprites.get_scale((30, 30))
+        self.screen.blit(icons['icon:help'], (10, 10)) 
         pygame.draw.rect(self.screen, BLACK, pygame.Rect(10, 10, 30, 50), 2)
         text_surface = font.render('H',0,(0, 0, 0))
         self.screen.blit(text_surface, (15,30))
-        cam = pygame.image.load('assets/icons/camera.png')
-        cam = pygame.transform.scale(cam, (30, 30))
-        self.screen.blit(cam, (50, 10))
+        self.screen.blit(icons['icon:camera'], (50, 10))
         pygame.draw.rect(self.screen, BLACK, pygame.Rect(50, 10, 30, 50), 2)
         text_surface = font.render('C',0,(0, 0, 0))
         self.screen.blit(text_surface, (55,30))
@@ -142,19 +295,21 @@ class Game:
     def load_player_image(self):
         player_path = "assets/characters/player.png"
         
+        self.player_image = "player"
         try:
             if os.path.exists(player_path):
-                self.player_image = pygame.image.load(player_path)
-                self.player_image = pygame.transform.scale(self.player_image, (TILE_SIZE, TILE_SIZE))
+                self.sprites.load(self.player_image, player_path)
             else:
                 print(f"File {player_path} not found. Using red square.")
-                self.player_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-                self.player_image.fill(RED)
+                default_player = pygame.Surface((TILE_SIZE, TILE_SIZE))
+                default_player.fill(RED)
+                self.sprites.add(self.player_image, default_player)
                 
         except pygame.error as e:
             print(f"Error loading image: {e}")
-            self.player_image = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            self.player_image.fill(RED)
+            default_player = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            default_player.fill(RED)
+            self.sprites.add(self.player_image, default_player)
     
     def load_monsters(self):
         self.monster_images = []
@@ -167,20 +322,21 @@ class Game:
             for extension in image_extensions:
                 monster_files.extend(glob.glob(os.path.join(monster_folder, extension)))
             
-            for monster_file in monster_files:
+            for monster_file in sorted(monster_files):
                 try:
-                    monster_image = pygame.image.load(monster_file)
-                    monster_image = pygame.transform.scale(monster_image, (TILE_SIZE, TILE_SIZE))
+                    monster_image = f"monster:{os.path.basename(monster_file)}"
+                    self.sprites.load(monster_image, monster_file)
                     self.monster_images.append(monster_image)
-                    print(f"Loaded monster: {os.path.basename(monster_file)}")
+                    self.event_log.log('asset_loaded', file=os.path.basename(monster_file))
                 except pygame.error as e:
-                    print(f"Error loading monster {monster_file}: {e}")
+                    self.event_log.log('asset_error', file=monster_file, error=str(e))
         
         if not self.monster_images:
-            print("No monster images found. Creating default blue squares.")
+            self.event_log.log('asset_missing', folder=monster_folder)
             default_monster = pygame.Surface((TILE_SIZE, TILE_SIZE))
             default_monster.fill(BLUE)
-            self.monster_images.append(default_monster)
+            self.sprites.add("monster:default", default_monster)
+            self.monster_images.append("monster:default")
     
     def spawn_monsters(self):
         self.monsters = []
@@ -188,23 +344,23 @@ class Game:
         if not self.monster_images:
             return
         
-        monster_count = random.randint(5, 15)
-        occupied_positions = {(self.player_grid_x, self.player_grid_y)}
+        monster_count = self.rng.randint(5, 15)
+        occupied_positions = {(p.grid_x, p.grid_y) for p in self.players}
         
         for _ in range(monster_count):
             attempts = 0
             while attempts < 100:
-                grid_x = random.randint(0, GRID_WIDTH - 1)
-                grid_y = random.randint(0, GRID_HEIGHT - 1)
+                grid_x = self.rng.randint(0, GRID_WIDTH - 1)
+                grid_y = self.rng.randint(0, GRID_HEIGHT - 1)
                 
                 if (grid_x, grid_y) not in occupied_positions:
-                    monster_image = random.choice(self.monster_images)
+                    monster_image = self.rng.choice(self.monster_images)
                     monster = Monster(grid_x, grid_y, monster_image)
                     
 
-                    monster.max_health = random.randint(1, 6)
+                    monster.max_health = self.rng.randint(1, 6)
                     monster.health = monster.max_health
-                    print(monster.max_health)
+                    self.event_log.log('monster_spawned', x=grid_x, y=grid_y, health=monster.max_health)
                     
                     self.monsters.append(monster)
                     occupied_positions.add((grid_x, grid_y))
@@ -212,110 +368,186 @@ class Game:
                 
                 attempts += 1
         
-        print(f"Spawned {len(self.monsters)} monsters")
+        self.event_log.log('wave_spawned', count=len(self.monsters))
 
     
     def draw_grid(self):
-        for x in range(0, SCREEN_WIDTH + 1, TILE_SIZE):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, SCREEN_HEIGHT))
+        left, top = self.to_screen(0, 0)
+        right, bottom = self.to_screen(SCREEN_WIDTH, SCREEN_HEIGHT)
+        for x in range(left, right + 1, self.tile_size):
+            pygame.draw.line(self.screen, GRAY, (x, top), (x, bottom))
         
-        for y in range(0, SCREEN_HEIGHT + 1, TILE_SIZE):
-            pygame.draw.line(self.screen, GRAY, (0, y), (SCREEN_WIDTH, y))
+        for y in range(top, bottom + 1, self.tile_size):
+            pygame.draw.line(self.screen, GRAY, (left, y), (right, y))
     
     def draw_monsters(self):
+        sprites = self.tile_sprites
         for monster in self.monsters:
-            px = monster.grid_x * TILE_SIZE
-            py = monster.grid_y * TILE_SIZE
-            self.screen.blit(monster.image, (px, py))
+            px = self.view_x + monster.grid_x * self.tile_size
+            py = self.view_y + monster.grid_y * self.tile_size
+            self.screen.blit(sprites[monster.image], (px, py))
             ratio = monster.health / monster.max_health
-            bar_w = TILE_SIZE
+            bar_w = self.tile_size
             bar_h = 6
             pygame.draw.rect(self.screen, (60, 0, 0), (px, py - 8, bar_w, bar_h))
             pygame.draw.rect(self.screen, (180, 0, 0), (px, py - 8, int(bar_w * ratio), bar_h))
             pygame.draw.rect(self.screen, BLACK, (px, py - 8, bar_w, bar_h), 1)
     
-    def draw_player(self):
-        pixel_x = self.player_grid_x * TILE_SIZE
-        pixel_y = self.player_grid_y * TILE_SIZE
-        self.screen.blit(self.player_image, (pixel_x, pixel_y))
+    def draw_players(self):
+        for player in self.players:
+            pixel_x = self.view_x + player.grid_x * self.tile_size
+            pixel_y = self.view_y + player.grid_y * self.tile_size
+            self.screen.blit(self.tile_sprites[player.image], (pixel_x, pixel_y))
+
+    def is_valid_hand(self, hand):
+        return 0 <= hand < HandGestureSettings.MAX_NUM_HANDS
+
+    def get_hand_player(self, hand):
+        while len(self.players) <= hand:
+            self.add_player()
+        return self.players[hand]
+
+    def add_player(self):
+        occupied = {(m.grid_x, m.grid_y) for m in self.monsters}
+        occupied.update((p.grid_x, p.grid_y) for p in self.players)
+        free_cells = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH) if (x, y) not in occupied]
+        grid_x, grid_y = free_cells[0] if free_cells else (0, 0)
+
+        image = self.player_image
+        character_files = [f for f in self.get_character_files() if os.path.basename(f) != "player.png"]
+        if character_files:
+            image = self.load_character(character_files[(len(self.players) - 1) % len(character_files)]) or image
+
+        self.players.append(Player(grid_x, grid_y, image))
+        self.event_log.log('player_joined', player=len(self.players), x=grid_x, y=grid_y)
+
+    def move_player(self, player, dx, dy):
+        if 0 <= player.grid_x + dx < GRID_WIDTH and 0 <= player.grid_y + dy < GRID_HEIGHT:
+            player.grid_x += dx
+            player.grid_y += dy
     
-    def run(self):
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            return False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                return False
+            elif event.key == pygame.K_h:
+                self.show_help_window = not self.show_help_window
+            elif event.key == pygame.K_c:  
+                self.toggle_hand_control()
+            elif event.key == pygame.K_r:
+                self.spawn_monsters()
+                self.level_completed = False
+            elif event.key == pygame.K_u:
+                self.change_player_character()
+            elif event.key == pygame.K_F11:
+                if not self.replaying:
+                    self.toggle_fullscreen()
+            elif event.key in [pygame.K_LEFT, pygame.K_a]:
+                self.move_player(self.players[0], -1, 0)
+            elif event.key in [pygame.K_RIGHT, pygame.K_d]:
+                self.move_player(self.players[0], 1, 0)
+            elif event.key in [pygame.K_UP, pygame.K_w]:
+                self.move_player(self.players[0], 0, -1)
+            elif event.key in [pygame.K_DOWN, pygame.K_s]:
+                self.move_player(self.players[0], 0, 1)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            if not self.show_help_window:
+                    if not self.hand_control_enabled:
+                        angle, distance = self.get_mouse_angle_and_distance(event.pos)
+                        if distance > 10:
+                            self.shoot_bullet(angle, distance)
+        elif event.type == pygame.VIDEORESIZE:
+            if not self.fullscreen:
+                self.pending_resize = (event.w, event.h)
+                self.pending_resize_time = pygame.time.get_ticks()
+        elif event.type == HAND_SHOOT and self.is_valid_hand(event.hand):
+            distance = 200  
+            self.shoot_bullet(event.angle, distance, self.get_hand_player(event.hand))
+        elif event.type == HAND_MOVE and self.is_valid_hand(event.hand):
+            self.move_player(self.get_hand_player(event.hand), event.dx, event.dy)
+        elif event.type == HAND_CONTROL:
+            self.hand_control_enabled = event.enabled
+        return True
+
+    def step(self, events):
+        running = True
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONUP and not self.replaying:
+                # Recorded in world units so replays do not depend on the window size
+                event = pygame.event.Event(pygame.MOUSEBUTTONUP, button=event.button, pos=self.to_world(event.pos))
+            if self.recorder:
+                self.recorder.record(self.tick_count, event)
+            if not self.handle_event(event):
+                running = False
+
+        self.update_bullets()
+        self.update_hit_tiles()
+        self.update_monsters(move_prob=0.02)
+        self.apply_pending_resize()
+        self.screen.fill(WHITE)
+        self.draw_grid()
+        if not self.show_help_window :
+            self.draw_ui_icons()
+        self.draw_hit_tiles()
+        self.draw_monsters()
+        self.draw_players()
+        self.draw_aim_line()
+        self.draw_bullets()
+        self.draw_help_window()
+
+        if self.level_completed:
+            self.screen.blit(self.get_overlay(180), (0, 0))
+
+            text1 = font.render("Well Done!", True, WHITE)
+            text2 = font.render("Press R to continue", True, WHITE)
+
+            width, height = self.screen.get_size()
+            self.screen.blit(text1, (width//2 - text1.get_width()//2, height//2 - 40))
+            self.screen.blit(text2, (width//2 - text2.get_width()//2, height//2 + 10))
+
+        pygame.display.flip()
+        self.event_log.end_tick()
+        self.tick_count += 1
+        return running
+
+    def run(self, input_player=None):
+        # With an input player the recorded session is replayed as fast as possible
+        self.replaying = input_player is not None
         running = True
         
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            frame_start = time.perf_counter()
+            if self.replaying:
+                pygame.event.clear()
+                events = input_player.events_for_tick(self.tick_count)
+            else:
+                events = pygame.event.get()
+
+            running = self.step(events)
+
+            if self.replaying:
+                input_player.record_frame_time(time.perf_counter() - frame_start)
+                if input_player.finished(self.tick_count):
                     running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    elif event.key == pygame.K_h:
-                        self.show_help_window = not self.show_help_window
-                    elif event.key == pygame.K_c:  
-                        self.toggle_hand_control()
-                    elif event.key == pygame.K_r:
-                        self.spawn_monsters()
-                        self.level_completed = False
-                    elif event.key == pygame.K_u:
-                        self.change_player_character()
-                    elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                        if self.player_grid_x > 0:
-                            self.player_grid_x -= 1
-                    elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                        if self.player_grid_x < GRID_WIDTH - 1:
-                            self.player_grid_x += 1
-                    elif event.key in [pygame.K_UP, pygame.K_w]:
-                        if self.player_grid_y > 0:
-                            self.player_grid_y -= 1
-                    elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                        if self.player_grid_y < GRID_HEIGHT - 1:
-                            self.player_grid_y += 1
-                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
-                    if not self.show_help_window:
-                            if not self.use_hand_control:
-                                angle, distance = self.get_mouse_angle_and_distance()
-                                if distance > 10:
-                                    self.shoot_bullet(angle, distance)
-        
-            self.update_bullets()
-            self.update_hit_tiles()
-            self.update_monsters(move_prob=0.02)
-            self.screen.fill(WHITE)
-            self.draw_grid()
-            if not self.show_help_window :
-                self.draw_ui_icons()
-            self.draw_hit_tiles()
-            self.draw_monsters()
-            self.draw_player()
-            self.draw_aim_line()
-            self.draw_bullets()
-            self.draw_help_window()
-
-            if self.level_completed:
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-                overlay.set_alpha(180)
-                overlay.fill(BLACK)
-                self.screen.blit(overlay, (0, 0))
-
-                text1 = font.render("Well Done!", True, WHITE)
-                text2 = font.render("Press R to continue", True, WHITE)
-
-                self.screen.blit(text1, (SCREEN_WIDTH//2 - text1.get_width()//2, SCREEN_HEIGHT//2 - 40))
-                self.screen.blit(text2, (SCREEN_WIDTH//2 - text2.get_width()//2, SCREEN_HEIGHT//2 + 10))
-
-            pygame.display.flip()
-            self.clock.tick(30)  
+            else:
+                self.clock.tick(30)  
 
-        if self.use_hand_control:
+        if self.use_hand_control and not self.replaying:
             self.stop_hand_control()
+        if self.recorder:
+            self.recorder.close()
+        self.event_log.close()
         self.hand_controller.close()
         pygame.quit()
 
-    def get_mouse_angle_and_distance(self):
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+    def get_mouse_angle_and_distance(self, pos=None):
+        mouse_x, mouse_y = pos if pos is not None else self.to_world(pygame.mouse.get_pos())
     
-        player_pixel_x = self.player_grid_x * TILE_SIZE + TILE_SIZE // 2
-        player_pixel_y = self.player_grid_y * TILE_SIZE + TILE_SIZE // 2
+        player = self.players[0]
+        player_pixel_x = player.grid_x * TILE_SIZE + TILE_SIZE // 2
+        player_pixel_y = player.grid_y * TILE_SIZE + TILE_SIZE // 2
     
         dx = mouse_x - player_pixel_x
         dy = mouse_y - player_pixel_y
@@ -327,14 +559,16 @@ class Game:
             return angle, distance
         return 0, 0
 
-    def shoot_bullet(self, angle, power):
+    def shoot_bullet(self, angle, power, player=None):
         import math
     
+        if player is None:
+            player = self.players[0]
         speed = min(power / 20, 10) 
     
         bullet = {
-        'x': self.player_grid_x * TILE_SIZE + TILE_SIZE // 2,
-        'y': self.player_grid_y * TILE_SIZE + TILE_SIZE // 2,
+        'x': player.grid_x * TILE_SIZE + TILE_SIZE // 2,
+        'y': player.grid_y * TILE_SIZE + TILE_SIZE // 2,
         'dx': math.cos(angle) * speed,
         'dy': math.sin(angle) * speed,
         'range_left': self.max_shoot_range * TILE_SIZE
@@ -371,9 +605,10 @@ class Game:
                         
                     if monster.health <= 0:
                             self.monsters.remove(monster)
-                            print(f"Monster destroyed at ({bullet_grid_x}, {bullet_grid_y}) with {damage} damage")
+                            self.event_log.log('monster_killed', x=bullet_grid_x, y=bullet_grid_y, damage=damage)
                     else:
-                            print(f"Monster hit! Health: {monster.health}/{monster.max_health}")
+                            self.event_log.log('monster_hit', x=bullet_grid_x, y=bullet_grid_y,
+                                               health=monster.health, max_health=monster.max_health)
                     
                     self.bullets.remove(bullet)
                     break
@@ -382,17 +617,19 @@ class Game:
 
 
     def draw_bullets(self):
+        radius = max(3, int(3 * self.view_scale))
         for bullet in self.bullets:
-            pygame.draw.circle(self.screen, BLACK, (int(bullet['x']), int(bullet['y'])), 3)
+            pygame.draw.circle(self.screen, BLACK, self.to_screen(bullet['x'], bullet['y']), radius)
 
     def draw_aim_line(self):
         if pygame.mouse.get_pressed()[0]:  
             mouse_x, mouse_y = pygame.mouse.get_pos()
-            player_pixel_x = self.player_grid_x * TILE_SIZE + TILE_SIZE // 2
-            player_pixel_y = self.player_grid_y * TILE_SIZE + TILE_SIZE // 2
+            player = self.players[0]
+            player_pixel_x = self.view_x + player.grid_x * self.tile_size + self.tile_size // 2
+            player_pixel_y = self.view_y + player.grid_y * self.tile_size + self.tile_size // 2
         
             distance = ((mouse_x - player_pixel_x)**2 + (mouse_y - player_pixel_y)**2)**0.5
-            max_distance = self.max_shoot_range * TILE_SIZE
+            max_distance = self.max_shoot_range * self.tile_size
         
             if distance > max_distance:
                 ratio = max_distance / distance
@@ -409,27 +646,21 @@ class Game:
                 self.hit_tiles.remove(hit_tile)
     def draw_hit_tiles(self):
         for hit_tile in self.hit_tiles:
-            pixel_x = hit_tile['x'] * TILE_SIZE
-            pixel_y = hit_tile['y'] * TILE_SIZE
+            pixel_x = self.view_x + hit_tile['x'] * self.tile_size
+            pixel_y = self.view_y + hit_tile['y'] * self.tile_size
             
-            red_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            red_surface.set_alpha(100)  #
-            red_surface.fill(RED)
-            self.screen.blit(red_surface, (pixel_x, pixel_y))
+            self.screen.blit(self.hit_surface, (pixel_x, pixel_y))
 
     def draw_help_window(self):
         if not self.show_help_window:
             return
         
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(150)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_overlay(150), (0, 0))
         
         window_width = 350
-        window_height = 280
-        window_x = (SCREEN_WIDTH - window_width) // 2
-        window_y = (SCREEN_HEIGHT - window_height) // 2
+        window_height = 400
+        window_x = (self.screen.get_width() - window_width) // 2
+        window_y = (self.screen.get_height() - window_height) // 2
         
         window_rect = pygame.Rect(window_x, window_y, window_width, window_height)
         pygame.draw.rect(self.screen, WHITE, window_rect)
@@ -451,12 +682,15 @@ class Game:
     "R                  -  Respawn Monsters", 
     "U                  -  Change Character",
     "H                  -  Toggle Help",
+    "F11                -  Toggle Fullscreen",
     "ESC                -  Exit Game",
     "",
     "HAND CONTROL:",
     "• Point with index finger",
     "• Make gun gesture (thumb + index)",
     "• Release gesture to shoot",
+    "• First hand aims and shoots for player 1",
+    "• A second hand moves and shoots player 2",
     "",
     "Press H again to close"
                     ]
@@ -479,24 +713,44 @@ class Game:
                 self.screen.blit(text_surface, (window_x + 20, window_y + y_offset))
             y_offset += 20
 
-    def change_player_character(self):
+    def get_character_files(self):
         character_folder = "assets/characters"
         image_extensions = ['*.png', '*.jpg', '*.jpeg', '*.bmp', '*.gif']
         character_files = []
 
         for ext in image_extensions:
             character_files.extend(glob.glob(os.path.join(character_folder, ext)))
+        return sorted(character_files)
 
-        if character_files:
-            new_character_file = random.choice(character_files)
+    def load_character(self, character_file):
+        image = f"character:{os.path.basename(character_file)}"
+        if image not in self.sprites:
             try:
-                new_image = pygame.image.load(new_character_file)
-                new_image = pygame.transform.scale(new_image, (TILE_SIZE, TILE_SIZE+10))
-                self.player_image = new_image
-                print(f"Player character changed to {os.path.basename(new_character_file)}")
+                self.sprites.load(image, character_file)
             except pygame.error as e:
-                print(f"Error loading character {new_character_file}: {e}")
+                print(f"Error loading character {character_file}: {e}")
+                return None
+            self.tile_sprites = self.sprites.get_scale((self.tile_size, self.tile_size))
+        return image
+
+    def change_player_character(self):
+        character_files = self.get_character_files()
+
+        if character_files:
+            new_character_file = self.rng.choice(character_files)
+            new_image = self.load_character(new_character_file)
+            if new_image:
+                self.players[0].image = new_image
+                print(f"Player character changed to {os.path.basename(new_character_file)}")
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", help="write the session's input log to this file")
+    parser.add_argument("--gesture-server", help="host:port of a gesture_service.py server")
+    args = parser.parse_args()
+
+    recorder = InputRecorder(args.record) if args.record else None
+    gesture_server = parse_address(args.gesture_server) if args.gesture_server else None
+    game = Game(seed=args.seed, recorder=recorder, gesture_server=gesture_server)
     game.run()
@@ -0,0 +1,50 @@
+import pygame
+from collections import OrderedDict
+
+
+class SpriteCacheSettings:
+    # Current size plus one spare so toggling fullscreen does not rebuild
+    MAX_SCALES = 2
+
+
+class SpriteCache:
+    def __init__(self, max_scales=SpriteCacheSettings.MAX_SCALES):
+        self.max_scales = max_scales
+        self.sources = {}
+        self.scales = OrderedDict()
+
+    def add(self, name, surface):
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self.sources[name] = surface
+        for scaled in self.scales.values():
+            scaled.pop(name, None)
+
+    def load(self, name, path):
+        self.add(name, pygame.image.load(path))
+
+    def __contains__(self, name):
+        return name in self.sources
+
+    def get_scale(self, size):
+        # Sprites are scaled the first time a size is asked for, never per blit
+        scaled = self.scales.get(size)
+        if scaled is None:
+            scaled = {}
+            self.scales[size] = scaled
+            while len(self.scales) > self.max_scales:
+                self.scales.popitem(last=False)
+        else:
+            self.scales.move_to_end(size)
+
+        if len(scaled) != len(self.sources):
+            for name, source in self.sources.items():
+                if name not in scaled:
+                    scaled[name] = pygame.transform.smoothscale(source, size)
+        return scaled
+
+    def get(self, name, size):
+        return self.get_scale(size)[name]
+
+    def clear(self):
+        self.scales.clear()